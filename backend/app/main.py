@@ -1,19 +1,43 @@
 from __future__ import annotations
 
-from io import BytesIO
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+import multiprocessing
+import os
 from pathlib import Path
+import shutil
+import tempfile
 
 from fastapi import FastAPI, File, HTTPException, UploadFile
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.responses import FileResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.background import BackgroundTask
 
-from .processor import process_workbook
+from .processor import process_workbook_file
 
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
 FRONTEND_DIR = ROOT_DIR / "frontend"
 
-app = FastAPI()
+
+def create_pool() -> ProcessPoolExecutor:
+    # Workbook cleanup is CPU-bound Python, so run it in separate processes to get
+    # past the GIL. Spawned workers do not inherit the server's event loop or threads.
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.pool = create_pool()
+    try:
+        yield
+    finally:
+        app.state.pool.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 app.mount("/static", StaticFiles(directory=FRONTEND_DIR), name="static")
 
 
@@ -24,21 +48,53 @@ def index() -> HTMLResponse:
 
 
 @app.post("/api/clean")
-async def clean(file: UploadFile = File(...)) -> StreamingResponse:
+async def clean(file: UploadFile = File(...)) -> FileResponse:
     if not file.filename or not file.filename.lower().endswith(".xlsx"):
         raise HTTPException(status_code=400, detail="Please upload a .xlsx file.")
 
-    content = await file.read()
-    if not content:
+    if not file.size:
         raise HTTPException(status_code=400, detail="Uploaded file is empty.")
 
-    output = process_workbook(content)
-    out_io = BytesIO(output)
+    # Worker processes only receive file paths, so the upload and the cleaned
+    # workbook are passed through a per-request temp directory on disk.
+    work_dir = Path(tempfile.mkdtemp(prefix="asset_report_"))
+    source_path = work_dir / "source.xlsx"
+    output_path = work_dir / "cleaned.xlsx"
+    try:
+        await asyncio.to_thread(save_upload, file, source_path)
+        await run_in_pool(process_workbook_file, str(source_path), str(output_path))
+    except Exception:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+
     headers = {
         "Content-Disposition": f"attachment; filename=cleaned_{file.filename}",
     }
-    return StreamingResponse(
-        out_io,
+    return FileResponse(
+        output_path,
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers=headers,
+        background=BackgroundTask(shutil.rmtree, work_dir, ignore_errors=True),
     )
+
+
+def save_upload(file: UploadFile, path: Path) -> None:
+    with path.open("wb") as out:
+        shutil.copyfileobj(file.file, out)
+
+
+async def run_in_pool(func, *args) -> None:
+    # A worker that dies abruptly (e.g. OOM-killed) leaves the pool permanently
+    # broken, so replace it and retry once rather than failing every later request.
+    loop = asyncio.get_running_loop()
+    for _ in range(2):
+        pool = app.state.pool
+        try:
+            await loop.run_in_executor(pool, func, *args)
+            return
+        except BrokenProcessPool:
+            # Concurrent requests on the same pool fail together; only the first replaces it
+            if app.state.pool is pool:
+                app.state.pool = create_pool()
+                pool.shutdown(wait=False)
+    raise HTTPException(status_code=500, detail="Workbook processing failed.")
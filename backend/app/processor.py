@@ -1,17 +1,111 @@
 from __future__ import annotations
 
+from collections import Counter
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime
 from io import BytesIO
+import posixpath
 import re
-from typing import List, Optional, Tuple
+from typing import BinaryIO, Dict, Final, List, Optional, Tuple, Union
+from zipfile import ZipFile
 
-from openpyxl import load_workbook
+from lxml import etree
+from openpyxl import Workbook, load_workbook
+from openpyxl.formatting.formatting import ConditionalFormatting, ConditionalFormattingList
 from openpyxl.formatting.rule import Rule
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
 from openpyxl.styles.differential import DifferentialStyle
 from openpyxl.utils import get_column_letter, column_index_from_string
 from openpyxl.worksheet.table import Table, TableStyleInfo
+from python_calamine import CalamineError, CalamineWorkbook
+
+
+# strptime's own sub-patterns, so the formats below accept exactly what strptime did
+_MONTH = r"(?P<month>1[0-2]|0[1-9]|[1-9])"
+_DAY = r"(?P<day>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])"
+_YEAR = r"(?P<year>\d\d\d\d)"
+_TIME = r"\s+(?P<hour>2[0-3]|[0-1]\d|\d):(?P<minute>[0-5]\d|\d):(?P<second>6[0-1]|[0-5]\d|\d)"
+
+# %m/%d/%Y, %m/%d/%Y %H:%M:%S, %m/%d/%y, %Y/%m/%d, %Y/%m/%d %H:%M:%S, %Y-%m-%d and
+# %Y-%m-%d %H:%M:%S. The slashed timestamp is what normalize_date_column makes of a dashed one.
+_DATE_PATTERNS: Final = tuple(
+    re.compile(pattern)
+    for pattern in (
+        rf"{_MONTH}/{_DAY}/{_YEAR}(?:{_TIME})?",
+        rf"{_MONTH}/{_DAY}/(?P<short_year>\d\d)",
+        rf"{_YEAR}/{_MONTH}/{_DAY}(?:{_TIME})?",
+        rf"{_YEAR}-{_MONTH}-{_DAY}(?:{_TIME})?",
+    )
+)
+_MAX_EXACT_INT: Final = 2**53
+_EXCEL_EPOCH_ORDINAL: Final = datetime(1899, 12, 30).toordinal()
+_REF_RE: Final = re.compile(r"([A-Z]+)(\d+):([A-Z]+)(\d+)")
+_CELL_RE: Final = re.compile(r"([A-Z]+)(\d+)")
+
+_MAIN_NS: Final = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_DOC_REL_NS: Final = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS: Final = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_CENTER: Final = Alignment(horizontal="center")
+_DATE_FORMAT: Final = "m/d/yy"
+_DATE_WIDTH: Final = len("mm/dd/yy")
+_NO_FILL: Final = PatternFill(fill_type=None)
+
+# Report header row styles
+_TITLE_FILL: Final = PatternFill(fill_type="solid", fgColor="FF366092")
+_HEADER_FONT: Final = Font(name="Calibri", size=18, color="FFFFFFFF", bold=True)
+_HEADER_ALIGNMENT: Final = Alignment(horizontal="center", vertical="center")
+_DOUBLE_BOTTOM: Final = Border(bottom=Side(style="double", color="FFFFFFFF"))
+
+
+def build_style_set(bad_font: str, neutral_font: str, good_font: str, check_font: str) -> dict:
+    def solid_fill(color: str) -> PatternFill:
+        return PatternFill(fill_type="solid", fgColor=color, bgColor=color)
+
+    return {
+        "bad": DifferentialStyle(
+            fill=solid_fill("FFFFC7CE"),
+            font=Font(color=bad_font),
+            border=Border(),
+        ),
+        "neutral": DifferentialStyle(
+            fill=solid_fill("FFFFEB9C"),
+            font=Font(color=neutral_font),
+            border=Border(),
+        ),
+        "good": DifferentialStyle(
+            fill=solid_fill("FFC6EFCE"),
+            font=Font(color=good_font),
+            border=Border(),
+        ),
+        "check": DifferentialStyle(
+            fill=solid_fill("FF7F7F7F"),
+            font=Font(color=check_font),
+            border=Border(),
+        ),
+    }
+
+
+# Conditional-formatting styles for the Unit Expiration Date and Quarter columns
+_DATE_STYLES: Final = build_style_set(
+    bad_font="FF9C0006",
+    neutral_font="FF9C5700",
+    good_font="FF006100",
+    check_font="FFFFFFFF",
+)
+_QUARTER_STYLES: Final = build_style_set(
+    bad_font="FF9C0006",
+    neutral_font="FF9C6500",
+    good_font="FF006100",
+    check_font="FFFFFFFF",
+)
+
+
+@dataclass
+class SourceSheet:
+    title: str
+    state: str
+    rows: List[list]
 
 
 @dataclass
@@ -22,39 +116,46 @@ class TableRef:
     end_row: int
 
 
-def process_workbook(content: bytes) -> bytes:
-    wb = load_workbook(BytesIO(content))
+def process_workbook(source: Union[bytes, BinaryIO], out: BinaryIO) -> None:
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+
+    # Copy the source values into a fresh workbook, skipping columns F:I on the active sheet.
+    # Other worksheets keep their values; styles and formulas are not carried over.
+    active, sheets = read_source_sheets(source)
+    wb = Workbook()
+    wb.remove(wb.active)
+    for index, sheet in enumerate(sheets):
+        target = wb.create_sheet(sheet.title)
+        target.sheet_state = sheet.state
+        for row in sheet.rows:
+            target.append(row[:5] + row[9:] if index == active else row)
+    wb.active = active
     ws = wb.active
 
-    # Remove columns F:I
-    ws.delete_cols(6, 4)
-
     # Normalize date columns early (before table creation)
-    unit_exp_col = find_header_column(ws, "Unit Expiration Date") or 4
-    reg_date_col = find_header_column(ws, "Registration Date") or 5
+    headers = header_columns(ws)
+    unit_exp_col = headers.get("Unit Expiration Date") or 4
+    reg_date_col = headers.get("Registration Date") or 5
     normalize_date_column(ws, unit_exp_col)
     normalize_date_column(ws, reg_date_col)
 
     last_row = find_last_row(ws, 1)
     if last_row < 2:
-        out = BytesIO()
         wb.save(out)
-        return out.getvalue()
-
-    clear_tables(ws)
+        return
 
     table1_ref = f"A1:E{last_row}"
     add_table(ws, "Asset_Report", table1_ref, style_name="TableStyleMedium2")
 
-    unmerge_row(ws, 1)
-
     # Copy column B to G
-    for row in range(1, last_row + 1):
-        ws.cell(row=row, column=7).value = ws.cell(row=row, column=2).value
+    column_b = next(ws.iter_cols(min_row=1, max_row=last_row, min_col=2, max_col=2, values_only=True))
+    column_g = next(ws.iter_cols(min_row=1, max_row=last_row, min_col=7, max_col=7))
+    for cell, value in zip(column_g, column_b):
+        cell.value = value
 
     # Remove duplicates in G (treat header as data)
-    remove_duplicates_in_column(ws, 7, 1, last_row)
-    last_row_g = find_last_row(ws, 7)
+    last_row_g = remove_duplicates_in_column(ws, 7, 1, last_row)
 
     # Add Count column in H
     ws.cell(row=1, column=8).value = "Count"
@@ -67,9 +168,6 @@ def process_workbook(content: bytes) -> bytes:
     add_table(ws, "Asset_Count", table2_ref, style_name="TableStyleMedium10")
     sort_table_by_column(ws, table2_ref, sort_col=8, header_row=1, reverse=True)
 
-    # Locate Unit Expiration Date column
-    unit_exp_col = find_header_column(ws, "Unit Expiration Date") or unit_exp_col
-
     # Insert Quarter column after Unit Expiration Date
     insert_at = unit_exp_col + 1
     ws.insert_cols(insert_at)
@@ -79,16 +177,19 @@ def process_workbook(content: bytes) -> bytes:
 
     quarter_col = insert_at
     ws.cell(row=1, column=quarter_col).value = "Quarter"
-    for row in range(2, find_last_row(ws, 1) + 1):
-        cell = ws.cell(row=row, column=unit_exp_col)
-        ws.cell(row=row, column=quarter_col).value = date_to_quarter(cell.value)
+    # Dates were normalized above, so anything that is not a datetime by now cannot be parsed
+    for date_cell, quarter_cell in ws.iter_rows(
+        min_row=2, max_row=last_row, min_col=unit_exp_col, max_col=quarter_col
+    ):
+        value = date_cell.value
+        quarter_cell.value = datetime_to_quarter(value) if isinstance(value, datetime) else ""
 
     # Update Asset_Report range to include new Quarter column
     table1_ref = expand_table_range(table1_ref, insert_at)
     update_table_ref(ws, "Asset_Report", table1_ref)
 
     # Quarter_Count output to K:L
-    quarter_counts = compute_quarter_counts(ws, quarter_col)
+    quarter_counts = compute_quarter_counts(ws, quarter_col, last_row)
     write_quarter_counts(ws, quarter_counts, start_col=11, start_row=1)
 
     # Sort Asset_Report by Unit Expiration Date ascending after all column changes
@@ -97,6 +198,7 @@ def process_workbook(content: bytes) -> bytes:
 
     # Build header row
     ws.insert_rows(1)
+    last_row += 1
     shift_table_rows(ws, 1, 1)
     build_asset_report_header(ws)
     update_table2_count_formulas(ws)
@@ -109,36 +211,149 @@ def process_workbook(content: bytes) -> bytes:
     ws.column_dimensions["G"].width = 9
     ws.column_dimensions["K"].width = 9.17
     ws.column_dimensions["L"].width = 14
+
     for row in range(3, 100):
-        ws.cell(row=row, column=9).alignment = Alignment(horizontal="center")
-        ws.cell(row=row, column=12).alignment = Alignment(horizontal="center")
+        ws.cell(row=row, column=9).alignment = _CENTER
+        ws.cell(row=row, column=12).alignment = _CENTER
 
     # Date formatting for Unit Expiration Date and Registration Date
-    last_row = find_last_row(ws, 1)
     for row in range(2, last_row + 1):
-        ws.cell(row=row, column=unit_exp_col).number_format = "m/d/yy"
-        ws.cell(row=row, column=reg_date_col).number_format = "m/d/yy"
+        ws.cell(row=row, column=unit_exp_col).number_format = _DATE_FORMAT
+        ws.cell(row=row, column=reg_date_col).number_format = _DATE_FORMAT
 
     autosize_columns(ws)
     ws.column_dimensions["I"].width = 50
 
-    out = BytesIO()
     wb.save(out)
-    return out.getvalue()
 
 
-def find_last_row(ws, col_idx: int) -> int:
-    for row in range(ws.max_row, 0, -1):
-        if ws.cell(row=row, column=col_idx).value not in (None, ""):
-            return row
-    return 0
+def process_workbook_file(source_path: str, out_path: str) -> None:
+    with open(source_path, "rb") as source, open(out_path, "wb") as out:
+        process_workbook(source, out)
+
+
+def read_source_sheets(source: BinaryIO) -> Tuple[int, List[SourceSheet]]:
+    try:
+        workbook = CalamineWorkbook.from_filelike(source)
+    except CalamineError:
+        # calamine only finds the workbook part under its usual name; openpyxl
+        # follows the package relationships, so let it read anything else
+        source.seek(0)
+        return read_source_sheets_openpyxl(source)
+    source.seek(0)
+    with ZipFile(source) as archive:
+        active, parts = workbook_sheets(archive)
+        sheets = []
+        for name, path, state in parts:
+            values = workbook.get_sheet_by_name(name).to_python(skip_empty_area=False)
+            rows = [[source_value(value) for value in row] for row in values]
+            add_error_cells(rows, read_error_cells(archive, path))
+            sheets.append(SourceSheet(name, state, rows))
+    return active, sheets
+
+
+def read_source_sheets_openpyxl(source: BinaryIO) -> Tuple[int, List[SourceSheet]]:
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    worksheets = workbook.worksheets
+    active = worksheets.index(workbook.active) if workbook.active in worksheets else 0
+    sheets = [SourceSheet(ws.title, ws.sheet_state, [list(row) for row in ws.values]) for ws in worksheets]
+    workbook.close()
+    return active, sheets
+
+
+def add_error_cells(rows: List[list], errors: Dict[Tuple[int, int], str]) -> None:
+    # calamine reads error cells as blanks; openpyxl kept their text (e.g. "#N/A")
+    for (row, col), value in errors.items():
+        while len(rows) < row:
+            rows.append([])
+        cells = rows[row - 1]
+        if len(cells) < col:
+            cells.extend([None] * (col - len(cells)))
+        cells[col - 1] = value
+
+
+def workbook_sheets(archive: ZipFile) -> Tuple[int, List[Tuple[str, str, str]]]:
+    # calamine has no notion of the active sheet or sheet state, so read them the way openpyxl did.
+    # Returns the active index and (name, part path, state) of each worksheet; chartsheets are skipped.
+    workbook_path = next(
+        part_path("", rel.get("Target"))
+        for rel in relationships(archive, "")
+        if rel.get("Type").endswith("/officeDocument")
+    )
+    workbook = etree.fromstring(archive.read(workbook_path))
+    view = workbook.find(f"{_MAIN_NS}bookViews/{_MAIN_NS}workbookView")
+    active_tab = int(view.get("activeTab", 0)) if view is not None else 0
+    targets = {rel.get("Id"): rel for rel in relationships(archive, workbook_path)}
+    active = 0
+    sheets = []
+    for position, sheet in enumerate(workbook.iterfind(f"{_MAIN_NS}sheets/{_MAIN_NS}sheet")):
+        rel = targets[sheet.get(f"{_DOC_REL_NS}id")]
+        if not rel.get("Type").endswith("/worksheet"):
+            continue
+        if position == active_tab:
+            active = len(sheets)
+        path = part_path(workbook_path, rel.get("Target"))
+        sheets.append((sheet.get("name"), path, sheet.get("state", "visible")))
+    return active, sheets
+
+
+def relationships(archive: ZipFile, part: str) -> list:
+    # The relationships of a part live in _rels/<name>.rels next to it; "" is the package itself
+    folder, name = posixpath.split(part)
+    rels = etree.fromstring(archive.read(posixpath.join(folder, "_rels", f"{name}.rels")))
+    return rels.findall(f"{_PKG_REL_NS}Relationship")
+
+
+def part_path(source_part: str, target: str) -> str:
+    # Targets are relative to the folder of the part that owns the relationship
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_part), target))
+
+
+def read_error_cells(archive: ZipFile, sheet_path: str) -> Dict[Tuple[int, int], str]:
+    # Error cells are rare, so only parse the sheet XML when it holds one
+    data = archive.read(sheet_path)
+    if b't="e"' not in data and b"t='e'" not in data:
+        return {}
+    errors = {}
+    for _, cell in etree.iterparse(BytesIO(data), tag=f"{_MAIN_NS}c"):
+        if cell.get("t") == "e":
+            errors[cell_position(cell)] = cell.findtext(f"{_MAIN_NS}v")
+        cell.clear()
+    return errors
+
+
+def cell_position(cell) -> Tuple[int, int]:
+    ref = _CELL_RE.fullmatch(cell.get("r") or "")
+    if ref:
+        return int(ref.group(2)), column_index_from_string(ref.group(1))
+    # The r attribute is optional; fall back to the enclosing row and the cell's place in it
+    row = cell.getparent()
+    return int(row.get("r")), row.index(cell) + 1
+
+
+def source_value(value):
+    # Map calamine's cell values onto what openpyxl would have read
+    value_type = type(value)
+    if value_type is str:
+        return value if value else None
+    if value_type is float:
+        # openpyxl read whole numbers as int, except large ones, which are stored in E notation
+        return int(value) if value.is_integer() and abs(value) < _MAX_EXACT_INT else value
+    if value_type is date:
+        return datetime(value.year, value.month, value.day)
+    return value
 
 
-def clear_tables(ws) -> None:
-    if hasattr(ws, "_tables"):
-        ws._tables.clear()
-    else:
-        ws.tables.clear()
+def find_last_row(ws, col_idx: int) -> int:
+    max_row = ws.max_row
+    last_row = 0
+    column = next(ws.iter_cols(min_row=1, max_row=max_row, min_col=col_idx, max_col=col_idx, values_only=True))
+    for row, value in enumerate(column, start=1):
+        if value not in (None, ""):
+            last_row = row
+    return last_row
 
 
 def add_table(ws, name: str, ref: str, style_name: Optional[str] = None) -> None:
@@ -170,99 +385,138 @@ def get_table_ref(ws, name: str) -> Optional[str]:
     return table.ref
 
 
-def remove_duplicates_in_column(ws, col_idx: int, start_row: int, end_row: int) -> None:
+def remove_duplicates_in_column(ws, col_idx: int, start_row: int, end_row: int) -> int:
+    column = [
+        value
+        for (value,) in ws.iter_rows(
+            min_row=start_row, max_row=end_row, min_col=col_idx, max_col=col_idx, values_only=True
+        )
+    ]
     seen = set()
-    write_row = start_row
-    for row in range(start_row, end_row + 1):
-        value = ws.cell(row=row, column=col_idx).value
+    unique = []
+    last_row = start_row - 1
+    for value in column:
         key = value if value is not None else ""
         if key in seen:
             continue
         seen.add(key)
-        if write_row != row:
-            ws.cell(row=write_row, column=col_idx).value = value
-        write_row += 1
-    for row in range(write_row, end_row + 1):
-        ws.cell(row=row, column=col_idx).value = None
+        unique.append(value)
+        if key != "":
+            last_row = start_row + len(unique) - 1
+    unique.extend([None] * (len(column) - len(unique)))
 
+    # Only touch cells whose value actually moved
+    for (cell,), value, current in zip(
+        ws.iter_rows(min_row=start_row, max_row=end_row, min_col=col_idx, max_col=col_idx), unique, column
+    ):
+        if value is not current:
+            cell.value = value
 
-def count_values(ws, col_idx: int, start_row: int, end_row: int) -> dict:
-    counts = {}
-    for row in range(start_row, end_row + 1):
-        value = ws.cell(row=row, column=col_idx).value
-        counts[value] = counts.get(value, 0) + 1
-    return counts
+    # Last row left holding a value, as find_last_row would report it
+    return last_row
 
 
-def normalize_date_column(ws, col_idx: int) -> None:
-    for row in range(2, ws.max_row + 1):
-        cell = ws.cell(row=row, column=col_idx)
-        if isinstance(cell.value, str) and "-" in cell.value:
-            cell.value = cell.value.replace("-", "/")
-        dt = parse_date(cell.value)
-        if dt:
-            cell.value = dt
+def count_values(ws, col_idx: int, start_row: int, end_row: int) -> Counter:
+    column = next(
+        ws.iter_cols(min_row=start_row, max_row=end_row, min_col=col_idx, max_col=col_idx, values_only=True)
+    )
+    return Counter(column)
 
 
-def unmerge_row(ws, row_idx: int) -> None:
-    merged_ranges = list(ws.merged_cells.ranges)
-    for merged_range in merged_ranges:
-        if merged_range.min_row <= row_idx <= merged_range.max_row:
-            ws.unmerge_cells(str(merged_range))
+def normalize_date_column(ws, col_idx: int) -> None:
+    max_row = ws.max_row
+    column = next(ws.iter_cols(min_row=2, max_row=max_row, min_col=col_idx, max_col=col_idx, values_only=True))
+    for row, value in enumerate(column, start=2):
+        normalized = value
+        if type(normalized) is str and "-" in normalized:
+            normalized = normalized.replace("-", "/")
+        dt = parse_date(normalized)
+        if dt is not None:
+            normalized = dt
+        if normalized is not value:
+            ws.cell(row=row, column=col_idx).value = normalized
 
 
 def autosize_columns(ws) -> None:
-    for col_idx, column_cells in enumerate(ws.iter_cols(min_row=1, max_row=ws.max_row), start=1):
-        max_len = 0
-        col_letter = get_column_letter(col_idx)
-        for cell in column_cells:
-            value = cell.value
+    max_row = ws.max_row
+    max_col = ws.max_column
+    widths = [0] * max_col
+    for values in ws.iter_rows(min_row=1, max_row=max_row, min_col=1, max_col=max_col, values_only=True):
+        for idx, value in enumerate(values):
             if value is None:
                 continue
-            if isinstance(value, datetime):
-                display = value.strftime("%m/%d/%y")
-            else:
-                display = str(value)
-            max_len = max(max_len, len(display))
+            # Dates are sized as their "%m/%d/%y" rendering, which has a fixed width
+            width = _DATE_WIDTH if isinstance(value, datetime) else len(str(value))
+            if width > widths[idx]:
+                widths[idx] = width
+
+    for col_idx, max_len in enumerate(widths, start=1):
         if max_len > 0:
-            ws.column_dimensions[col_letter].width = min(max_len + 2, 60)
+            ws.column_dimensions[get_column_letter(col_idx)].width = min(max_len + 2, 60)
 
 
 def sort_table_by_column(ws, ref: str, sort_col: int, header_row: int, reverse: bool) -> None:
     ref_obj = parse_ref(ref)
-    data_rows = []
-    for row in range(header_row + 1, ref_obj.end_row + 1):
-        row_values = [ws.cell(row=row, column=col).value for col in range(ref_obj.start_col, ref_obj.end_col + 1)]
-        sort_value = ws.cell(row=row, column=sort_col).value
-        data_rows.append((sort_value, row_values))
+    sort_offset = sort_col - ref_obj.start_col
+    data_rows = list(
+        ws.iter_rows(
+            min_row=header_row + 1,
+            max_row=ref_obj.end_row,
+            min_col=ref_obj.start_col,
+            max_col=ref_obj.end_col,
+            values_only=True,
+        )
+    )
 
-    data_rows.sort(key=lambda item: (item[0] is None, item[0]), reverse=reverse)
+    keys = [(values[sort_offset] is None, values[sort_offset]) for values in data_rows]
+    order = sorted(range(len(data_rows)), key=keys.__getitem__, reverse=reverse)
 
-    for idx, (_, row_values) in enumerate(data_rows, start=header_row + 1):
-        for offset, value in enumerate(row_values):
-            ws.cell(row=idx, column=ref_obj.start_col + offset).value = value
+    reorder_rows(ws, data_rows, order, header_row + 1, ref_obj.start_col, ref_obj.end_col)
 
 
 def sort_table_by_date(ws, ref: str, date_col: int) -> None:
     ref_obj = parse_ref(ref)
-    data_rows = []
-    for row in range(ref_obj.start_row + 1, ref_obj.end_row + 1):
-        row_values = [ws.cell(row=row, column=col).value for col in range(ref_obj.start_col, ref_obj.end_col + 1)]
-        sort_value = parse_date(ws.cell(row=row, column=date_col).value)
-        data_rows.append((sort_value, row_values))
+    date_offset = date_col - ref_obj.start_col
+    data_rows = list(
+        ws.iter_rows(
+            min_row=ref_obj.start_row + 1,
+            max_row=ref_obj.end_row,
+            min_col=ref_obj.start_col,
+            max_col=ref_obj.end_col,
+            values_only=True,
+        )
+    )
 
-    data_rows.sort(key=lambda item: (item[0] is None, item[0] or datetime.min))
+    dates = [parse_date(values[date_offset]) for values in data_rows]
+    keys = [(dt is None, dt or datetime.min) for dt in dates]
+    order = sorted(range(len(data_rows)), key=keys.__getitem__)
+
+    reorder_rows(ws, data_rows, order, ref_obj.start_row + 1, ref_obj.start_col, ref_obj.end_col)
+
+
+def reorder_rows(
+    ws, data_rows: List[tuple], order: List[int], start_row: int, start_col: int, end_col: int
+) -> None:
+    for (dst_idx, src_idx), row_cells in zip(
+        enumerate(order),
+        ws.iter_rows(min_row=start_row, max_row=start_row + len(order) - 1, min_col=start_col, max_col=end_col),
+    ):
+        # Rows already in place keep their cells untouched
+        if dst_idx == src_idx:
+            continue
+        for cell, value in zip(row_cells, data_rows[src_idx]):
+            cell.value = value
 
-    for idx, (_, row_values) in enumerate(data_rows, start=ref_obj.start_row + 1):
-        for offset, value in enumerate(row_values):
-            ws.cell(row=idx, column=ref_obj.start_col + offset).value = value
 
 def date_to_quarter(value) -> str:
     dt = parse_date(value)
     if dt is None:
         return ""
-    quarter = ((dt.month - 1) // 3) + 1
-    return f"{dt.year} Q{quarter}"
+    return datetime_to_quarter(dt)
+
+
+def datetime_to_quarter(dt: datetime) -> str:
+    return f"{dt.year} Q{(dt.month + 2) // 3}"
 
 
 def parse_date(value) -> Optional[datetime]:
@@ -270,22 +524,34 @@ def parse_date(value) -> Optional[datetime]:
         return value
     if isinstance(value, (int, float)):
         try:
-            return datetime.fromordinal(datetime(1899, 12, 30).toordinal() + int(value))
+            return datetime.fromordinal(_EXCEL_EPOCH_ORDINAL + int(value))
         except ValueError:
             return None
     if isinstance(value, str):
-        for fmt in (
-            "%m/%d/%Y",
-            "%m/%d/%y",
-            "%Y/%m/%d",
-            "%Y-%m-%d",
-            "%m/%d/%Y %H:%M:%S",
-            "%Y-%m-%d %H:%M:%S",
-        ):
-            try:
-                return datetime.strptime(value, fmt)
-            except ValueError:
-                continue
+        for pattern in _DATE_PATTERNS:
+            match = pattern.fullmatch(value)
+            if match:
+                break
+        else:
+            return None
+        parts = match.groupdict()
+        if "short_year" in parts:
+            # Same pivot as strptime's %y
+            short_year = int(parts["short_year"])
+            year = short_year + (2000 if short_year <= 68 else 1900)
+        else:
+            year = int(parts["year"])
+        try:
+            return datetime(
+                year,
+                int(parts["month"]),
+                int(parts["day"]),
+                int(parts.get("hour") or 0),
+                int(parts.get("minute") or 0),
+                int(parts.get("second") or 0),
+            )
+        except ValueError:
+            return None
     return None
 
 
@@ -308,24 +574,11 @@ def apply_unit_expiration_conditional_formatting(
     good_formula = f"=AND(ISNUMBER({ref_cell}),YEAR({ref_cell})>=YEAR(TODAY())+2)"
     check_formula = f"=OR(NOT(ISNUMBER({ref_cell})),YEAR({ref_cell})<YEAR(TODAY()))"
 
-    ws.conditional_formatting._cf_rules.clear()
+    ws.conditional_formatting = ConditionalFormattingList()
 
     date_range = f"{date_letter}{start_row}:{date_letter}{end_row}"
     quarter_range = f"{quarter_letter}{start_row}:{quarter_letter}{end_row}"
 
-    date_styles = build_style_set(
-        bad_font="FF9C0006",
-        neutral_font="FF9C5700",
-        good_font="FF006100",
-        check_font="FFFFFFFF",
-    )
-    quarter_styles = build_style_set(
-        bad_font="FF9C0006",
-        neutral_font="FF9C6500",
-        good_font="FF006100",
-        check_font="FFFFFFFF",
-    )
-
     add_style_rules(
         ws,
         date_range,
@@ -333,7 +586,7 @@ def apply_unit_expiration_conditional_formatting(
         neutral_formula,
         good_formula,
         check_formula,
-        date_styles,
+        _DATE_STYLES,
         stop_if_true_check=True,
         stop_if_true_current=False,
         precheck_formula=non_number_formula,
@@ -345,41 +598,13 @@ def apply_unit_expiration_conditional_formatting(
         neutral_formula,
         good_formula,
         check_formula,
-        quarter_styles,
+        _QUARTER_STYLES,
         stop_if_true_check=False,
         stop_if_true_current=True,
         precheck_formula=non_number_formula,
     )
 
 
-def build_style_set(bad_font: str, neutral_font: str, good_font: str, check_font: str) -> dict:
-    def solid_fill(color: str) -> PatternFill:
-        return PatternFill(fill_type="solid", fgColor=color, bgColor=color)
-
-    return {
-        "bad": DifferentialStyle(
-            fill=solid_fill("FFFFC7CE"),
-            font=Font(color=bad_font),
-            border=Border(),
-        ),
-        "neutral": DifferentialStyle(
-            fill=solid_fill("FFFFEB9C"),
-            font=Font(color=neutral_font),
-            border=Border(),
-        ),
-        "good": DifferentialStyle(
-            fill=solid_fill("FFC6EFCE"),
-            font=Font(color=good_font),
-            border=Border(),
-        ),
-        "check": DifferentialStyle(
-            fill=solid_fill("FF7F7F7F"),
-            font=Font(color=check_font),
-            border=Border(),
-        ),
-    }
-
-
 def add_style_rules(
     ws,
     cell_range: str,
@@ -401,20 +626,21 @@ def add_style_rules(
         Rule(type="expression", dxf=styles["good"], stopIfTrue=True, formula=[good_formula]),
         Rule(type="expression", dxf=styles["check"], stopIfTrue=stop_if_true_check, formula=[check_formula]),
     ]
+    # Parse the range once and attach every rule to the same ConditionalFormatting entry
+    cf = ConditionalFormatting(cell_range)
     for rule in rules:
         if rule is not None:
-            ws.conditional_formatting.add(cell_range, rule)
+            ws.conditional_formatting.add(cf, rule)
 
 
-def compute_quarter_counts(ws, quarter_col: int) -> List[Tuple[str, int]]:
-    last_row = find_last_row(ws, quarter_col)
-    counts = {}
-    for row in range(2, last_row + 1):
-        value = ws.cell(row=row, column=quarter_col).value
-        if not value:
-            continue
-        counts[value] = counts.get(value, 0) + 1
-    return sorted(counts.items())
+def compute_quarter_counts(ws, quarter_col: int, last_row: Optional[int] = None) -> List[Tuple[str, int]]:
+    if last_row is None:
+        last_row = find_last_row(ws, quarter_col)
+    column = next(
+        ws.iter_cols(min_row=2, max_row=last_row, min_col=quarter_col, max_col=quarter_col, values_only=True)
+    )
+    counts = Counter(column)
+    return sorted((quarter, count) for quarter, count in counts.items() if quarter)
 
 
 def update_table2_count_formulas(ws) -> None:
@@ -428,76 +654,75 @@ def update_table2_count_formulas(ws) -> None:
 
 
 def write_quarter_counts(ws, counts: List[Tuple[str, int]], start_col: int, start_row: int) -> None:
-    ws.cell(row=start_row, column=start_col).value = "Quarter"
-    ws.cell(row=start_row, column=start_col + 1).value = "Count"
-    for idx, (quarter, _count) in enumerate(counts, start=start_row + 1):
-        ws.cell(row=idx, column=start_col).value = quarter
-        ws.cell(row=idx, column=start_col + 1).value = (
-            f"=COUNTIF(E:E,{get_column_letter(start_col)}{idx + 1})"
-        )
-
     last_row = start_row + len(counts)
-    table_ref = f"{get_column_letter(start_col)}{start_row}:{get_column_letter(start_col + 1)}{last_row}"
+    key_letter = get_column_letter(start_col)
+    rows = ws.iter_rows(min_row=start_row, max_row=last_row, min_col=start_col, max_col=start_col + 1)
+
+    header_cells = next(rows)
+    header_cells[0].value = "Quarter"
+    header_cells[1].value = "Count"
+    for idx, ((quarter, _count), (quarter_cell, count_cell)) in enumerate(zip(counts, rows), start=start_row + 1):
+        quarter_cell.value = quarter
+        count_cell.value = f"=COUNTIF(E:E,{key_letter}{idx + 1})"
+
+    table_ref = f"{key_letter}{start_row}:{get_column_letter(start_col + 1)}{last_row}"
     add_table(ws, "Renewal_Schedule", table_ref, style_name="TableStyleMedium12")
     table = ws.tables.get("Renewal_Schedule")
     if table:
-        header_range = f"{get_column_letter(start_col)}{start_row}:{get_column_letter(start_col + 1)}{start_row}"
-        for row in ws[header_range]:
-            for cell in row:
-                cell.fill = PatternFill(fill_type=None)
+        for cell in header_cells:
+            cell.fill = _NO_FILL
 
 
 def build_asset_report_header(ws) -> None:
-    title_fill = PatternFill(fill_type="solid", fgColor="FF366092")
-    white_font = Font(name="Calibri", size=18, color="FFFFFFFF", bold=True)
-    header_font = Font(name="Calibri", size=18, color="FFFFFFFF", bold=True)
-    center = Alignment(horizontal="center", vertical="center")
-    double_bottom = Border(bottom=Side(style="double", color="FFFFFFFF"))
-
     ws.merge_cells("A1:F1")
     cell = ws["A1"]
     cell.value = "Asset Report"
-    cell.alignment = center
-    cell.fill = title_fill
-    cell.font = white_font
+    cell.alignment = _HEADER_ALIGNMENT
+    cell.fill = _TITLE_FILL
+    cell.font = _HEADER_FONT
 
     ws.merge_cells("H1:I1")
     cell = ws["H1"]
     cell.value = "Asset Count"
-    cell.alignment = center
+    cell.alignment = _HEADER_ALIGNMENT
     cell.style = "Accent2"
-    cell.font = header_font
-    cell.border = double_bottom
+    cell.font = _HEADER_FONT
+    cell.border = _DOUBLE_BOTTOM
 
     ws.merge_cells("K1:L1")
     cell = ws["K1"]
     cell.value = "Renewal Schedule"
-    cell.alignment = center
+    cell.alignment = _HEADER_ALIGNMENT
     cell.style = "Accent4"
-    cell.font = header_font
-    cell.border = double_bottom
+    cell.font = _HEADER_FONT
+    cell.border = _DOUBLE_BOTTOM
 
+    # Each merged range is a single row
     for addr in ("A1:F1", "H1:I1", "K1:L1"):
-        for row in ws[addr]:
-            for cell in row:
-                cell.border = double_bottom
+        for cell in ws[addr][0]:
+            cell.border = _DOUBLE_BOTTOM
 
-    for row in ws["A1:L1"]:
-        for cell in row:
-            if cell.value is not None:
-                cell.font = white_font
-                cell.alignment = center
+    for cell in ws["A1:L1"][0]:
+        if cell.value is not None:
+            cell.font = _HEADER_FONT
+            cell.alignment = _HEADER_ALIGNMENT
 
 
 def parse_ref(ref: str) -> TableRef:
-    match = re.match(r"([A-Z]+)(\d+):([A-Z]+)(\d+)", ref)
+    match = _REF_RE.match(ref)
     if not match:
         raise ValueError(f"Invalid range: {ref}")
-    start_col = column_index_from_string(match.group(1))
-    start_row = int(match.group(2))
-    end_col = column_index_from_string(match.group(3))
-    end_row = int(match.group(4))
-    return TableRef(start_col, start_row, end_col, end_row)
+    start_letter, start_row, end_letter, end_row = match.groups()
+    return TableRef(
+        column_index_from_string(start_letter),
+        int(start_row),
+        column_index_from_string(end_letter),
+        int(end_row),
+    )
+
+
+def format_ref(tr: TableRef) -> str:
+    return f"{get_column_letter(tr.start_col)}{tr.start_row}:{get_column_letter(tr.end_col)}{tr.end_row}"
 
 
 def expand_table_range(ref: str, insert_col: int) -> str:
@@ -506,7 +731,7 @@ def expand_table_range(ref: str, insert_col: int) -> str:
         tr.end_col += 1
     if tr.start_col >= insert_col:
         tr.start_col += 1
-    return f"{get_column_letter(tr.start_col)}{tr.start_row}:{get_column_letter(tr.end_col)}{tr.end_row}"
+    return format_ref(tr)
 
 
 def shift_table_columns(ws, insert_col: int, offset: int) -> None:
@@ -516,7 +741,7 @@ def shift_table_columns(ws, insert_col: int, offset: int) -> None:
             tr.start_col += offset
         if tr.end_col >= insert_col:
             tr.end_col += offset
-        table.ref = f"{get_column_letter(tr.start_col)}{tr.start_row}:{get_column_letter(tr.end_col)}{tr.end_row}"
+        table.ref = format_ref(tr)
         if table.autoFilter:
             table.autoFilter.ref = table.ref
 
@@ -528,13 +753,17 @@ def shift_table_rows(ws, insert_row: int, offset: int) -> None:
             tr.start_row += offset
         if tr.end_row >= insert_row:
             tr.end_row += offset
-        table.ref = f"{get_column_letter(tr.start_col)}{tr.start_row}:{get_column_letter(tr.end_col)}{tr.end_row}"
+        table.ref = format_ref(tr)
         if table.autoFilter:
             table.autoFilter.ref = table.ref
 
 
-def find_header_column(ws, header_name: str) -> Optional[int]:
-    for col in range(1, ws.max_column + 1):
-        if ws.cell(row=1, column=col).value == header_name:
-            return col
-    return None
+def header_columns(ws) -> dict:
+    headers = {}
+    max_col = ws.max_column
+    header_row = next(ws.iter_rows(min_row=1, max_row=1, min_col=1, max_col=max_col, values_only=True), ())
+    for col, value in enumerate(header_row, start=1):
+        if value is not None:
+            # Keep the first column for a repeated header
+            headers.setdefault(value, col)
+    return headers
@@ -15,4 +15,5 @@ source "$VENV_DIR/bin/activate"
 pip install -r "$BACKEND_DIR/requirements.txt"
 
 cd "$BACKEND_DIR"
-exec uvicorn app.main:app --host 0.0.0.0 --port 8080
+exec uvicorn app.main:app --host 0.0.0.0 --port 8080 \
+  --workers "${WORKERS:-1}" --loop auto --http auto
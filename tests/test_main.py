@@ -0,0 +1,104 @@
+import os
+import sys
+import tempfile
+import unittest
+from io import BytesIO
+from unittest import mock
+
+from fastapi.testclient import TestClient
+from openpyxl import Workbook, load_workbook
+
+TESTS_DIR = os.path.dirname(__file__)
+REPO_ROOT = os.path.abspath(os.path.join(TESTS_DIR, ".."))
+sys.path.insert(0, os.path.join(REPO_ROOT, "backend"))
+
+from app import main
+
+
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def build_source() -> bytes:
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Serial", "Model", "Description", "Unit Expiration Date", "Registration Date", "F", "G", "H", "I"])
+    ws.append(["SN1", "FG-60F", "Edge", "2026-05-20", "2024-05-20", 1, 2, 3, 4])
+    out = BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+class TestCleanEndpoint(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Entering the client runs the lifespan, which starts the process pool
+        cls.client = TestClient(main.app, raise_server_exceptions=False)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.client.__exit__(None, None, None)
+
+    def setUp(self) -> None:
+        self.work_dirs = []
+        mkdtemp = tempfile.mkdtemp
+
+        def record_mkdtemp(*args, **kwargs):
+            path = mkdtemp(*args, **kwargs)
+            self.work_dirs.append(path)
+            return path
+
+        patcher = mock.patch.object(main.tempfile, "mkdtemp", side_effect=record_mkdtemp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, filename: str, content: bytes):
+        return self.client.post("/api/clean", files={"file": (filename, content, XLSX_TYPE)})
+
+    def assert_work_dirs_removed(self) -> None:
+        self.assertTrue(self.work_dirs)
+        for path in self.work_dirs:
+            self.assertFalse(os.path.exists(path))
+
+    def test_clean_returns_report(self) -> None:
+        response = self.post("assets.xlsx", build_source())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-disposition"], "attachment; filename=cleaned_assets.xlsx")
+        self.assertEqual(load_workbook(BytesIO(response.content)).active["A1"].value, "Asset Report")
+        self.assert_work_dirs_removed()
+
+    def test_clean_rejects_other_extensions(self) -> None:
+        response = self.post("assets.csv", b"Serial\n")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.work_dirs, [])
+
+    def test_clean_rejects_empty_upload(self) -> None:
+        response = self.post("assets.xlsx", b"")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"detail": "Uploaded file is empty."})
+        self.assertEqual(self.work_dirs, [])
+
+    def test_clean_fails_on_corrupt_upload_and_keeps_serving(self) -> None:
+        response = self.post("assets.xlsx", b"not a workbook")
+
+        self.assertEqual(response.status_code, 500)
+        self.assert_work_dirs_removed()
+        self.assertEqual(self.post("assets.xlsx", build_source()).status_code, 200)
+
+    def test_clean_recovers_from_broken_pool(self) -> None:
+        pool = main.app.state.pool
+        with self.assertRaises(main.BrokenProcessPool):
+            pool.submit(os._exit, 1).result()
+
+        response = self.post("assets.xlsx", build_source())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNot(main.app.state.pool, pool)
+        self.assert_work_dirs_removed()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,8 +2,12 @@ import os
 import sys
 import unittest
 from datetime import datetime
+from io import BytesIO
+from zipfile import ZipFile
 
-from openpyxl import Workbook
+from lxml import etree
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font
 
 TESTS_DIR = os.path.dirname(__file__)
 REPO_ROOT = os.path.abspath(os.path.join(TESTS_DIR, ".."))
@@ -27,13 +31,63 @@ class TestDateHelpers(unittest.TestCase):
         self.assertIsNotNone(dt)
         self.assertEqual((dt.year, dt.month, dt.day), (2024, 3, 15))
 
+    def test_parse_date_accepts_month_first_string(self) -> None:
+        self.assertEqual(processor.parse_date("3/5/2024"), datetime(2024, 3, 5))
+        self.assertEqual(processor.parse_date("03/05/24"), datetime(2024, 3, 5))
+        self.assertEqual(processor.parse_date("12/31/99"), datetime(1999, 12, 31))
+
+    def test_parse_date_accepts_time_component(self) -> None:
+        self.assertEqual(processor.parse_date("2024-03-15 08:30:05"), datetime(2024, 3, 15, 8, 30, 5))
+        self.assertEqual(processor.parse_date("03/15/2024 8:30:05"), datetime(2024, 3, 15, 8, 30, 5))
+
+    def test_parse_date_treats_bools_as_excel_serials(self) -> None:
+        self.assertEqual(processor.parse_date(True), datetime(1899, 12, 31))
+
+    def test_parse_date_only_accepts_baseline_formats(self) -> None:
+        self.assertIsNone(processor.parse_date("03-15-2024"))
+        self.assertIsNone(processor.parse_date("03/15/24 08:30:05"))
+
     def test_parse_date_rejects_invalid(self) -> None:
         self.assertIsNone(processor.parse_date("not a date"))
+        self.assertIsNone(processor.parse_date("02/30/2024"))
+        self.assertIsNone(processor.parse_date("2024-03"))
 
     def test_date_to_quarter(self) -> None:
         self.assertEqual(processor.date_to_quarter("2024-05-20"), "2024 Q2")
         self.assertEqual(processor.date_to_quarter(None), "")
 
+    def test_datetime_to_quarter_boundaries(self) -> None:
+        self.assertEqual(processor.datetime_to_quarter(datetime(2024, 3, 31)), "2024 Q1")
+        self.assertEqual(processor.datetime_to_quarter(datetime(2024, 4, 1)), "2024 Q2")
+        self.assertEqual(processor.datetime_to_quarter(datetime(2024, 12, 31)), "2024 Q4")
+
+    def test_normalize_date_column(self) -> None:
+        wb = Workbook()
+        ws = wb.active
+        values = ["Unit Expiration Date", "2024-03-15", 45000, "N-A", None]
+        for idx, value in enumerate(values, start=1):
+            ws.cell(row=idx, column=1).value = value
+
+        processor.normalize_date_column(ws, 1)
+
+        self.assertEqual(ws["A1"].value, "Unit Expiration Date")
+        self.assertEqual(ws["A2"].value, datetime(2024, 3, 15))
+        self.assertEqual(ws["A3"].value, processor.parse_date(45000))
+        self.assertEqual(ws["A4"].value, "N/A")
+        self.assertIsNone(ws["A5"].value)
+
+    def test_normalize_date_column_parses_dashed_timestamps(self) -> None:
+        wb = Workbook()
+        ws = wb.active
+        ws["A1"] = "Unit Expiration Date"
+        ws["A2"] = "2024-03-15 08:30:05"
+        ws["A3"] = "2024/03/15 08:30:05"
+
+        processor.normalize_date_column(ws, 1)
+
+        self.assertEqual(ws["A2"].value, datetime(2024, 3, 15, 8, 30, 5))
+        self.assertEqual(ws["A3"].value, datetime(2024, 3, 15, 8, 30, 5))
+
 
 class TestTableRefHelpers(unittest.TestCase):
     def test_parse_ref(self) -> None:
@@ -55,13 +109,33 @@ class TestWorksheetTransforms(unittest.TestCase):
         for idx, value in enumerate(values, start=1):
             ws.cell(row=idx, column=1).value = value
 
-        processor.remove_duplicates_in_column(ws, 1, 1, 4)
+        last_row = processor.remove_duplicates_in_column(ws, 1, 1, 4)
 
+        self.assertEqual(last_row, 3)
         self.assertEqual(ws.cell(row=1, column=1).value, "Header")
         self.assertEqual(ws.cell(row=2, column=1).value, "A")
         self.assertEqual(ws.cell(row=3, column=1).value, "B")
         self.assertIsNone(ws.cell(row=4, column=1).value)
 
+    def test_remove_duplicates_in_column_ignores_trailing_blank(self) -> None:
+        wb = Workbook()
+        ws = wb.active
+        values = ["Header", "A", None, "A", ""]
+        for idx, value in enumerate(values, start=1):
+            ws.cell(row=idx, column=1).value = value
+
+        last_row = processor.remove_duplicates_in_column(ws, 1, 1, 5)
+
+        self.assertEqual(last_row, processor.find_last_row(ws, 1))
+        self.assertEqual(last_row, 2)
+
+    def test_header_columns_keeps_first_match(self) -> None:
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["Serial", None, "Unit Expiration Date", "Serial"])
+
+        self.assertEqual(processor.header_columns(ws), {"Serial": 1, "Unit Expiration Date": 3})
+
     def test_count_values(self) -> None:
         wb = Workbook()
         ws = wb.active
@@ -86,6 +160,58 @@ class TestWorksheetTransforms(unittest.TestCase):
         counts = processor.compute_quarter_counts(ws, 1)
         self.assertEqual(counts, [("2024 Q1", 2), ("2025 Q3", 1)])
 
+    def test_sort_table_by_date_puts_undated_rows_last(self) -> None:
+        wb = Workbook()
+        ws = wb.active
+        rows = [
+            ("Serial", "Unit Expiration Date"),
+            ("SN1", "2025-06-01"),
+            ("SN2", None),
+            ("SN3", datetime(2024, 1, 1)),
+            ("SN4", "12/31/2024"),
+        ]
+        for row in rows:
+            ws.append(row)
+
+        processor.sort_table_by_date(ws, "A1:B5", 2)
+
+        self.assertEqual(
+            [ws.cell(row=row, column=1).value for row in range(1, 6)], ["Serial", "SN3", "SN4", "SN1", "SN2"]
+        )
+
+    def test_sort_table_by_column_descending(self) -> None:
+        wb = Workbook()
+        ws = wb.active
+        for row in (("Asset", "Count"), ("A", 1), ("B", 3), ("C", 1), ("D", 2)):
+            ws.append(row)
+
+        processor.sort_table_by_column(ws, "A1:B5", sort_col=2, header_row=1, reverse=True)
+
+        self.assertEqual([ws.cell(row=row, column=1).value for row in range(2, 6)], ["B", "D", "A", "C"])
+
+    def test_write_quarter_counts(self) -> None:
+        wb = Workbook()
+        ws = wb.active
+
+        processor.write_quarter_counts(ws, [("2024 Q1", 2), ("2025 Q3", 1)], start_col=11, start_row=1)
+
+        self.assertEqual([ws["K1"].value, ws["L1"].value], ["Quarter", "Count"])
+        self.assertEqual([ws["K2"].value, ws["K3"].value], ["2024 Q1", "2025 Q3"])
+        self.assertEqual(ws["L2"].value, "=COUNTIF(E:E,K3)")
+        self.assertEqual(ws.tables["Renewal_Schedule"].ref, "K1:L3")
+
+    def test_apply_unit_expiration_conditional_formatting(self) -> None:
+        wb = Workbook()
+        ws = wb.active
+
+        processor.apply_unit_expiration_conditional_formatting(ws, "A2:F10", 4, 5)
+        processor.apply_unit_expiration_conditional_formatting(ws, "A2:F10", 4, 5)
+
+        rules_by_range = {str(cf.sqref): cf.rules for cf in ws.conditional_formatting}
+        self.assertEqual(sorted(rules_by_range), ["D3:D10", "E3:E10"])
+        self.assertEqual([len(rules) for rules in rules_by_range.values()], [5, 5])
+        self.assertEqual(rules_by_range["D3:D10"][0].formula, ["=NOT(ISNUMBER($D3))"])
+
     def test_update_table2_count_formulas(self) -> None:
         wb = Workbook()
         ws = wb.active
@@ -101,5 +227,174 @@ class TestWorksheetTransforms(unittest.TestCase):
         self.assertEqual(ws["H3"].value, "=COUNTIF(B:B,G3)")
 
 
+class TestProcessWorkbook(unittest.TestCase):
+    def build_source(self) -> bytes:
+        wb = Workbook()
+        ws = wb.active
+        ws.append(
+            ["Serial", "Model", "Description", "Unit Expiration Date", "Registration Date", "F", "G", "H", "I"]
+        )
+        ws.append(["SN1", "FG-60F", "Edge", "2026-05-20", datetime(2024, 5, 20), 1, 2, 3, 4])
+        ws.append(["SN2", "FG-40F", "Branch", "01/15/2025", datetime(2023, 1, 15), 1, 2, 3, 4])
+        ws.append(["SN3", "FG-60F", "Edge", datetime(2027, 8, 1), datetime(2024, 8, 1), 1, 2, 3, 4])
+        out = BytesIO()
+        wb.save(out)
+        return out.getvalue()
+
+    def test_read_source_sheets_matches_openpyxl_values(self) -> None:
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Assets"
+        ws.append(["Serial", 7, 2.5, datetime(2024, 5, 20), datetime(2024, 5, 20, 8, 30)])
+        ws.append([None, "", True, 1e20, 1.234567890123457e16])
+        source = BytesIO()
+        wb.save(source)
+        source.seek(0)
+
+        active, sheets = processor.read_source_sheets(source)
+        rows = sheets[0].rows
+
+        self.assertEqual(active, 0)
+        self.assertEqual(sheets[0].title, "Assets")
+        self.assertEqual(rows[0], ["Serial", 7, 2.5, datetime(2024, 5, 20), datetime(2024, 5, 20, 8, 30)])
+        self.assertIs(type(rows[0][1]), int)
+        self.assertEqual(rows[1], [None, None, True, 1e20, 1.234567890123457e16])
+        self.assertIs(type(rows[1][3]), float)
+
+    def test_read_source_sheets_reads_every_worksheet(self) -> None:
+        wb = Workbook()
+        wb.active.title = "First"
+        wb.active.append(["first"])
+        second = wb.create_sheet("Second")
+        second.append(["second"])
+        hidden = wb.create_sheet("Hidden")
+        hidden.sheet_state = "hidden"
+        wb.active = 1
+        source = BytesIO()
+        wb.save(source)
+        source.seek(0)
+
+        active, sheets = processor.read_source_sheets(source)
+
+        self.assertEqual(active, 1)
+        self.assertEqual([sheet.title for sheet in sheets], ["First", "Second", "Hidden"])
+        self.assertEqual([sheet.state for sheet in sheets], ["visible", "visible", "hidden"])
+        self.assertEqual(sheets[1].rows, [["second"]])
+
+    def test_read_source_sheets_keeps_error_values(self) -> None:
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["Serial", "Model"])
+        ws.append(["SN1", "#N/A"])
+        ws["B2"].data_type = "e"
+        ws["D3"] = "#DIV/0!"
+        ws["D3"].data_type = "e"
+        source = BytesIO()
+        wb.save(source)
+        source.seek(0)
+
+        _, sheets = processor.read_source_sheets(source)
+        rows = sheets[0].rows
+
+        self.assertEqual(rows[1][:2], ["SN1", "#N/A"])
+        self.assertEqual(rows[2][3], "#DIV/0!")
+
+    def build_renamed_package(self) -> bytes:
+        # A valid package whose workbook part is not at xl/workbook.xml
+        wb = Workbook()
+        wb.active.title = "Assets"
+        wb.active.append(["Serial", "#N/A"])
+        wb.active["B1"].data_type = "e"
+        source = BytesIO()
+        wb.save(source)
+        renames = {"xl/workbook.xml": "xl/book.xml", "xl/_rels/workbook.xml.rels": "xl/_rels/book.xml.rels"}
+        out = BytesIO()
+        with ZipFile(source) as src, ZipFile(out, "w") as dst:
+            for name in src.namelist():
+                data = src.read(name).replace(b"/xl/workbook.xml", b"/xl/book.xml")
+                dst.writestr(renames.get(name, name), data.replace(b'"xl/workbook.xml"', b'"xl/book.xml"'))
+        return out.getvalue()
+
+    def test_workbook_sheets_follows_package_relationships(self) -> None:
+        with ZipFile(BytesIO(self.build_renamed_package())) as archive:
+            active, sheets = processor.workbook_sheets(archive)
+
+        self.assertEqual(active, 0)
+        self.assertEqual(sheets, [("Assets", "xl/worksheets/sheet1.xml", "visible")])
+
+    def test_read_source_sheets_reads_renamed_workbook_part(self) -> None:
+        active, sheets = processor.read_source_sheets(BytesIO(self.build_renamed_package()))
+
+        self.assertEqual(active, 0)
+        self.assertEqual(sheets[0].title, "Assets")
+        self.assertEqual(sheets[0].rows, [["Serial", "#N/A"]])
+
+    def test_cell_position_falls_back_to_row_order(self) -> None:
+        row = etree.fromstring(
+            '<row xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" r="4"><c/><c t="e"/></row>'
+        )
+
+        self.assertEqual(processor.cell_position(row[1]), (4, 2))
+
+    def run_process_workbook(self, content: bytes):
+        out = BytesIO()
+        processor.process_workbook(content, out)
+        out.seek(0)
+        return load_workbook(out).active
+
+    def test_process_workbook_copies_values_only(self) -> None:
+        wb = load_workbook(BytesIO(self.build_source()))
+        ws = wb.active
+        ws["A1"].font = Font(bold=True)
+        ws["A2"].number_format = "0.00"
+        other = wb.create_sheet("Other")
+        other["A1"] = "kept"
+        other["B1"] = "=1+1"
+        source = BytesIO()
+        wb.save(source)
+
+        out = BytesIO()
+        processor.process_workbook(source.getvalue(), out)
+        report = load_workbook(BytesIO(out.getvalue()))
+
+        # Other worksheets come back as values; styles and formulas are not kept
+        self.assertEqual(report.sheetnames, ["Sheet", "Other"])
+        self.assertEqual(report.active.title, "Sheet")
+        self.assertEqual(report["Other"]["A1"].value, "kept")
+        self.assertIsNone(report["Other"]["B1"].value)
+        self.assertFalse(report.active["A2"].font.b)
+        self.assertEqual(report.active["A3"].number_format, "General")
+
+    def test_process_workbook_builds_report_tables(self) -> None:
+        ws = self.run_process_workbook(self.build_source())
+
+        self.assertEqual(ws["A1"].value, "Asset Report")
+        self.assertEqual(
+            [cell.value for cell in ws[2][:6]],
+            ["Serial", "Model", "Description", "Unit Expiration Date", "Quarter", "Registration Date"],
+        )
+        self.assertEqual([ws.cell(row=row, column=1).value for row in range(3, 6)], ["SN2", "SN1", "SN3"])
+        self.assertEqual([ws.cell(row=row, column=5).value for row in range(3, 6)], ["2025 Q1", "2026 Q2", "2027 Q3"])
+        self.assertEqual(ws["D3"].value, datetime(2025, 1, 15))
+        self.assertEqual(ws["D3"].number_format, "m/d/yy")
+        self.assertEqual(
+            dict(ws.tables.items()),
+            {"Asset_Report": "A2:F5", "Asset_Count": "H2:I4", "Renewal_Schedule": "K2:L5"},
+        )
+        self.assertEqual([ws["H3"].value, ws["H4"].value], ["FG-60F", "FG-40F"])
+        self.assertEqual(ws["I3"].value, "=COUNTIF(B:B,H3)")
+
+    def test_process_workbook_without_data_rows(self) -> None:
+        wb = Workbook()
+        wb.active.append(["Serial", "Model", "Description", "Unit Expiration Date", "Registration Date", "F"])
+        source = BytesIO()
+        wb.save(source)
+
+        ws = self.run_process_workbook(source.getvalue())
+
+        self.assertEqual(ws.max_column, 5)
+        self.assertEqual(len(ws.tables), 0)
+
+
 if __name__ == "__main__":
     unittest.main()